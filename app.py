@@ -21,6 +21,8 @@ import streamlit as st
 
 from chatbot import Chatbot
 
+MAX_RENDERED_MESSAGES = 50
+
 
 def sync_secrets_to_env() -> None:
     """
@@ -45,6 +47,18 @@ def sync_secrets_to_env() -> None:
             os.environ["TAVILY_API_KEY"] = tavily_key
 
 
+@st.cache_resource
+def get_chatbot() -> Chatbot:
+    """
+    Create the Chatbot once per process and reuse it across Streamlit reruns and
+    sessions, so its LLM and search clients (and their connection pools) are not
+    rebuilt on every widget interaction.
+
+    API keys must already be present in the environment (see `sync_secrets_to_env`).
+    """
+    return Chatbot()
+
+
 def initialize_session_state() -> None:
     """
     Initialize chat history list in Streamlit session state if not already present.
@@ -55,13 +69,39 @@ def initialize_session_state() -> None:
 
 def display_chat_history() -> None:
     """
-    Display all messages stored in the session's chat history.
+    Display the most recent messages stored in the session's chat history.
+
+    Only the last `MAX_RENDERED_MESSAGES` messages are rendered on every rerun, so the
+    cost of a rerun does not grow with the length of the conversation. Older messages
+    are only rendered when the user turns on the "Show older messages" toggle; the
+    full history is always kept in session state.
+    """
+    history = st.session_state.history
+    older = history[:-MAX_RENDERED_MESSAGES]
+    # Streamlit derives the widget id from the label too, so the label must not change
+    # between turns (e.g. by including the message count) or the toggle resets
+    if older and st.toggle("Show older messages", key="show_older_messages"):
+        for message in older:
+            render_message(message)
+    for message in history[-MAX_RENDERED_MESSAGES:]:
+        render_message(message)
+
+
+def render_message(message: dict) -> None:
     """
-    for message in st.session_state.history:
-        with st.chat_message(message["role"]):
-            st.write(message["content"])
-            if "sources" in message:
-                render_sources_expander(message["sources"])
+    Render a single chat history message, including its sources if present.
+
+    Parameters:
+        - message (dict): A history entry with "role", "content" and optionally
+          "sources" keys.
+
+    Returns:
+        - None
+    """
+    with st.chat_message(message["role"]):
+        st.write(message["content"])
+        if "sources" in message:
+            render_sources_expander(message["sources"])
 
 
 def generate_response(
@@ -71,9 +111,10 @@ def generate_response(
     Generate a response from the chatbot, optionally using web search for additional
     context.
 
-    This function wraps the chatbot's response generation logic and displays a visual
-    spinner while processing. It handles both direct responses and responses enriched
-    with citations when web search is enabled.
+    This function wraps the chatbot's response generation logic and streams the answer
+    into the current container as it is generated. When web search is enabled, a
+    collapsed status element is shown only while the search is running; no spinner is
+    shown for the LLM phase, since tokens appear as soon as they are generated.
 
     Parameters:
         - prompt (str): The user's input question or statement.
@@ -85,9 +126,16 @@ def generate_response(
         - sources (dict[str, str]): A dictionary of source name → URL pairs extracted
           from the response.
     """
-    message = "Searching..." if enable_search else "Generating response..."
-    with st.spinner(message):
-        return chatbot.generate_response(prompt, enable_search)
+
+    def search_with_status(query: str) -> str:
+        with st.status("Searching...", expanded=False) as status:
+            context = chatbot.search(query)
+            status.update(label="Search complete", state="complete")
+        return context
+
+    stream = chatbot.stream_response(prompt, enable_search, search=search_with_status)
+    answer = st.write_stream(stream)
+    return answer, stream.sources
 
 
 def handle_user_input(
@@ -108,14 +156,12 @@ def handle_user_input(
         st.write(prompt)
     st.session_state.history.append({"role": "user", "content": prompt})
 
-    # Create a placeholder to defer rendering of the assistant's message
-    # until the chatbot response is fully generated (prevents grayed-out UI)
+    # Render the assistant's message in a placeholder so that the streamed answer
+    # replaces any stale element from the previous run (prevents grayed-out UI)
     placeholder = st.empty()
 
-    answer, sources = generate_response(prompt, chatbot, enable_search)
-
     with placeholder.chat_message("assistant"):
-        st.write(answer)
+        answer, sources = generate_response(prompt, chatbot, enable_search)
         if sources:
             render_sources_expander(sources)
     st.session_state.history.append(
@@ -153,7 +199,7 @@ def main() -> None:
     st.title("LangChain QA Chatbot")
     sync_secrets_to_env()
     enable_search = st.checkbox("Enable Web Search")
-    chatbot = Chatbot()
+    chatbot = get_chatbot()
     initialize_session_state()
     display_chat_history()
     prompt = st.chat_input("Ask anything")
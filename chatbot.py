@@ -12,43 +12,39 @@ Features:
 - Supports retry logic for LLM and search errors using exponential backoff.
 - Dynamically loads API keys from the environment (or .env via dotenv).
 - Provides source citation parsing from model output, enabling transparency.
+- Reuses previous answers for repeated prompts via an in-memory response cache.
+- Memoizes web search results per prompt for a few minutes.
+- Streams the answer text as it is generated, for immediate display in the UI.
 """
 
+import itertools
+import json
 import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from functools import lru_cache, partial
 
 import backoff
+import cachetools
+import httpx
+import openai
+import requests
 from dotenv import load_dotenv
 from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.exceptions import LangChainException
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
+from langchain_community.utilities.tavily_search import TAVILY_API_URL
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.outputs import Generation
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables.base import Runnable
-from langchain_core.tools import ToolException
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
 load_dotenv()
 
-PROMPT_TEMPLATE = PromptTemplate(
-    input_variables=["prompt", "context"],
-    template=(
-        "You are a highly knowledgeable assistant. Your goal is to answer the user's "
-        "question clearly, concisely, and with factual accuracy. If supporting context "
-        "is provided, incorporate it into the answer and cite it.\n\n"
-        "Please follow these guidelines:\n"
-        "1. Answer in a factual and neutral tone.\n"
-        "2. Prefer concise sentences (2-3 lines max).\n"
-        "3. Use bullet points or short paragraphs if multiple points are needed.\n"
-        "4. Do not make up information if context is insufficient.\n"
-        "5. If no context is provided, DO NOT include any information on sources in "
-        "the response.\n"
-        "6. If a context is provided, ALWAYS include citations.\n"
-        "7. Format the response as JSON with this structure:\n"
-        '{{\n  "answer": "<main response>",\n  "sources": {{ "Name": "URL" }}\n}}\n\n'
-        "User question: {prompt}\n\n"
-        "Context:\n{context}"
-    ),
-)
+# Only transient API errors are worth retrying; schema or parsing errors fail fast
+RETRYABLE_LLM_ERRORS = (openai.RateLimitError, openai.APIConnectionError)
 
 
 class ChatbotResponse(BaseModel):
@@ -59,6 +55,316 @@ class ChatbotResponse(BaseModel):
     )
 
 
+OUTPUT_PARSER = PydanticOutputParser(pydantic_object=ChatbotResponse)
+
+# Static instructions go in the system message, ahead of anything request-specific, so
+# that the prompt prefix stays byte-identical across calls
+SYSTEM_GUIDELINES = (
+    "You are a highly knowledgeable assistant. Your goal is to answer the user's "
+    "question clearly, concisely, and with factual accuracy. If supporting context "
+    "is provided, incorporate it into the answer and cite it.\n\n"
+    "Please follow these guidelines:\n"
+    "1. Answer in a factual and neutral tone.\n"
+    "2. Prefer concise sentences (2-3 lines max).\n"
+    "3. Use bullet points or short paragraphs if multiple points are needed.\n"
+    "4. Do not make up information if context is insufficient.\n"
+    "5. If no context is provided, DO NOT include any information on sources in "
+    "the response.\n"
+    "6. If a context is provided, ALWAYS include citations.\n"
+    "7. Format the response as JSON.\n\n"
+    "{format_instructions}"
+)
+
+USER_TEMPLATE = "User question: {prompt}\n\nContext:\n{context}"
+
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages(
+    [("system", SYSTEM_GUIDELINES), ("user", USER_TEMPLATE)]
+).partial(format_instructions=OUTPUT_PARSER.get_format_instructions())
+
+
+class ResponseCache:
+    """
+    An in-memory cache of chatbot responses keyed by normalized prompt text, so that
+    repeated questions reuse a previous answer instead of triggering a new search and
+    LLM call.
+
+    Prompts are compared after case folding, collapsing whitespace and stripping
+    trailing punctuation, so "What is X?" and "what is x" share an entry. Entries are
+    keyed by whether web search was enabled as well, so answers without citations
+    never satisfy a search-enabled request and vice versa. Answers based on web search
+    go stale as the results change, so they expire after `search_ttl` seconds.
+
+    Attributes:
+        - max_entries (int): Maximum number of cached responses per search mode; the
+          least recently used entries are evicted first.
+        - search_ttl (float): Number of seconds a search-enabled response is kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        search_ttl: float = 600,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty response cache.
+
+        Parameters:
+            - max_entries (int, optional): Maximum number of cached responses per
+              search mode (default 256).
+            - search_ttl (float, optional): Number of seconds a search-enabled
+              response is kept (default 600).
+            - timer (Callable, optional): Clock used to expire search-enabled
+              responses (default `time.monotonic`).
+        """
+        self.max_entries = max_entries
+        self.search_ttl = search_ttl
+        self._entries = cachetools.LRUCache(maxsize=max_entries)
+        self._search_entries = cachetools.TTLCache(
+            maxsize=max_entries, ttl=search_ttl, timer=timer
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(prompt: str, enable_search: bool) -> tuple[str, bool]:
+        """
+        Build the cache key for a prompt: its normalized text and the search flag.
+        """
+        return " ".join(prompt.casefold().split()).rstrip("?!. "), enable_search
+
+    def get(self, prompt: str, enable_search: bool) -> ChatbotResponse | None:
+        """
+        Return the cached response for the given prompt, if any.
+
+        Parameters:
+            - prompt (str): The user's question or prompt.
+            - enable_search (bool): Whether the request uses web search context.
+
+        Returns:
+            - ChatbotResponse | None: The cached response, or None on a miss.
+        """
+        entries = self._search_entries if enable_search else self._entries
+        with self._lock:
+            return entries.get(self._key(prompt, enable_search))
+
+    def put(self, prompt: str, enable_search: bool, response: ChatbotResponse) -> None:
+        """
+        Store a response for the given prompt.
+
+        Parameters:
+            - prompt (str): The user's question or prompt.
+            - enable_search (bool): Whether the request used web search context.
+            - response (ChatbotResponse): The response to cache.
+        """
+        entries = self._search_entries if enable_search else self._entries
+        with self._lock:
+            entries[self._key(prompt, enable_search)] = response
+
+
+def parse_response(text: str) -> ChatbotResponse:
+    """
+    Strictly parse the complete LLM output into a `ChatbotResponse`.
+
+    Unlike the output parser's partial mode used while streaming, which silently
+    repairs truncated JSON and skips non-JSON output, this requires a complete JSON
+    object with a non-empty answer. Any text after the object is ignored.
+
+    Parameters:
+        - text (str): The full text generated by the LLM, optionally wrapped in a
+          markdown code block or followed by other text.
+
+    Returns:
+        - ChatbotResponse: The validated response.
+
+    Raises:
+        - OutputParserException: If the text is not valid JSON matching the response
+          schema, or if the answer is empty.
+    """
+    try:
+        # Decode the first JSON object, skipping any markdown fence around it and
+        # ignoring trailing text after it
+        start = text.find("{")
+        if start == -1:
+            raise ValueError("no JSON object found")
+        data, _ = json.JSONDecoder().raw_decode(text, start)
+        response = ChatbotResponse.model_validate(data)
+    except ValueError as e:
+        raise OutputParserException(
+            f"Invalid chatbot response: {e}", llm_output=text
+        ) from e
+    if not response.answer.strip():
+        raise OutputParserException(
+            "Chatbot response has an empty answer", llm_output=text
+        )
+    return response
+
+
+class ResponseStream:
+    """
+    An iterable over the answer text of a chatbot response as it is generated.
+
+    Iterating yields the newly generated part of the answer, batched so that at most
+    one chunk is emitted per `flush_interval` seconds: every yielded chunk triggers a
+    UI update in Streamlit, and re-rendering on every token makes long answers slow.
+    The partial JSON is only parsed when a chunk is due. Once the stream is exhausted,
+    the full text is parsed strictly with `parse_response`, the rest of the answer is
+    yielded, and `response` holds the complete structured response, including the
+    cited sources.
+
+    Attributes:
+        - response (ChatbotResponse): The latest (eventually final) response received.
+        - enable_search (bool): Whether web search context was used; sources are only
+          exposed through `sources` when it is True.
+    """
+
+    flush_interval: float = 0.05
+
+    def __init__(
+        self,
+        chunks: Iterator[str],
+        enable_search: bool = False,
+        on_complete: Callable[[ChatbotResponse], None] | None = None,
+    ):
+        """
+        Wrap an iterator of raw LLM text chunks.
+
+        Parameters:
+            - chunks (Iterator[str]): The JSON text generated by the LLM, chunk by
+              chunk, as emitted by streaming the chain.
+            - enable_search (bool, optional): Whether web search context was used
+              (default False).
+            - on_complete (Callable, optional): Called with the final response, with
+              sources already filtered, once the stream is exhausted and the response
+              has been validated.
+        """
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self.enable_search = enable_search
+        self.response = ChatbotResponse(answer="")
+
+    @property
+    def sources(self) -> dict[str, str]:
+        """
+        The sources cited by the response, or an empty dictionary if web search was not
+        enabled, even if the LLM included them.
+        """
+        return self.response.sources if self.enable_search else {}
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yield the answer text as it is generated.
+
+        Raises:
+            - OutputParserException: If the complete output is not a valid response.
+        """
+        text = ""
+        # Length of the answer text yielded so far
+        sent = 0
+        # Flush the first delta right away so the time to first token is unaffected
+        last_flush = float("-inf")
+        for chunk in self._chunks:
+            text += chunk
+            # Re-parsing the accumulated text costs time proportional to its length, so
+            # only do it when a flush is due rather than on every token
+            if time.monotonic() - last_flush < self.flush_interval:
+                continue
+            parsed = OUTPUT_PARSER.parse_result([Generation(text=text)], partial=True)
+            if parsed is None:
+                continue
+            self.response = parsed
+            if len(parsed.answer) > sent:
+                yield parsed.answer[sent:]
+                sent = len(parsed.answer)
+                last_flush = time.monotonic()
+        self.response = parse_response(text)
+        if len(self.response.answer) > sent:
+            yield self.response.answer[sent:]
+        if self._on_complete is not None:
+            self._on_complete(
+                ChatbotResponse(answer=self.response.answer, sources=self.sources)
+            )
+
+
+@lru_cache(maxsize=None)
+def _get_http_client() -> httpx.Client:
+    """
+    Return a process-wide HTTP/2 client for OpenAI requests.
+
+    Sharing one pooled client between all chat model instances lets requests be
+    multiplexed over a single kept-alive connection, instead of paying a new TCP and
+    TLS handshake on a fresh connection.
+    """
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """
+    Return a process-wide ChatOpenAI instance for the given model settings, so that
+    every Chatbot reuses the same client and its keep-alive connection pool.
+    """
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        streaming=True,
+        http_client=_get_http_client(),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_search_session() -> requests.Session:
+    """
+    Return a process-wide HTTP session for Tavily requests.
+
+    The LangChain Tavily wrapper posts through module-level `requests.post`, which
+    opens a new connection per call; searches are sent through this session instead so
+    that the kept-alive TCP and TLS connection to Tavily is reused.
+    """
+    return requests.Session()
+
+
+@lru_cache(maxsize=None)
+def _get_search_tool() -> TavilySearchResults:
+    """
+    Return a process-wide Tavily search tool instance shared by every Chatbot. It holds
+    the search configuration and API key; requests are sent by `Chatbot.search`.
+
+    It is created lazily rather than at import time because the tool reads
+    TAVILY_API_KEY on construction, which may only be set after import (e.g. from
+    Streamlit secrets).
+    """
+    return TavilySearchResults(include_answer=True)
+
+
+def _is_permanent_search_error(error: requests.RequestException) -> bool:
+    """
+    Return whether a failed search request should not be retried: client errors such as
+    an invalid API key (4xx) fail the same way every time, except for rate limiting
+    (429).
+    """
+    response = error.response
+    return (
+        response is not None
+        and 400 <= response.status_code < 500
+        and response.status_code != 429
+    )
+
+
+def _format_search_context(raw_results: dict) -> str:
+    """
+    Condense a raw Tavily response into the context passed to the LLM: the answer
+    generated by Tavily followed by a numbered list of result titles and URLs.
+    """
+    sources = "\n".join(
+        f"{i}. {result['title']}: {result['url']}"
+        for i, result in enumerate(raw_results.get("results", []), start=1)
+    )
+    return f"Answer: {raw_results.get('answer') or ''}\n\nSources:\n{sources}"
+
+
 class Chatbot:
     """
     A minimal chatbot that can optionally enrich responses with real-time web
@@ -66,17 +372,25 @@ class Chatbot:
     retry/backoff on transient errors.
 
     Attributes:
-        - prompt_template (PromptTemplate): The template used to format the user's
+        - prompt_template (ChatPromptTemplate): The template used to format the user's
           prompt and optional context into a prompt for the LLM.
         - llm (ChatOpenAI): The OpenAI chat model instance used to generate responses.
         - search_tool (TavilySearchResults): The Tavily search tool instance used to
           fetch real-time search results and context.
-        - parser (StrOutputParser): Parses the raw LLM output into a clean string.
-        - chain (Runnable): A composed runnable sequence: prompt_template | llm | "
-        "parser.
+        - parser (PydanticOutputParser): Parses the LLM's JSON output into a
+          `ChatbotResponse` with the answer and cited sources.
+        - chain (Runnable): A composed runnable sequence: prompt_template | llm |
+          StrOutputParser, producing the raw JSON text to be parsed by `parse_response`
+          (or incrementally by `ResponseStream`).
+        - cache (ResponseCache): Cache of previous responses keyed by normalized
+          prompt text; search-enabled responses expire with the search results.
     """
 
     max_retries: int = 5
+    max_retry_time: float = 15
+    search_cache_size: int = 256
+    search_cache_ttl: float = 600
+    search_timeout: float = 10
 
     def __init__(
         self,
@@ -94,10 +408,15 @@ class Chatbot:
         """
         self._validate_api_keys()
         self.prompt_template = PROMPT_TEMPLATE
-        self.llm = ChatOpenAI(name=llm_model, temperature=temperature)
-        self.search_tool = TavilySearchResults(include_answer=True)
-        self.parser = PydanticOutputParser(pydantic_object=ChatbotResponse)
-        self.chain: Runnable = self.prompt_template | self.llm | self.parser
+        self.llm = _get_llm(llm_model, temperature)
+        self.search_tool = _get_search_tool()
+        self.parser = OUTPUT_PARSER
+        self.chain: Runnable = self.prompt_template | self.llm | StrOutputParser()
+        self.cache = ResponseCache(search_ttl=self.search_cache_ttl)
+        self._search_cache = cachetools.TTLCache(
+            maxsize=self.search_cache_size, ttl=self.search_cache_ttl
+        )
+        self._search_cache_lock = threading.Lock()
 
     @staticmethod
     def _validate_api_keys() -> None:
@@ -115,16 +434,26 @@ class Chatbot:
 
     @backoff.on_exception(
         backoff.expo,
-        ToolException,
+        requests.RequestException,
         max_tries=max_retries,
+        max_time=max_retry_time,
+        jitter=backoff.full_jitter,
+        giveup=_is_permanent_search_error,
     )
-    def _search(self, prompt: str) -> str:
+    def search(self, prompt: str) -> str:
         """
         Perform a web search for the given prompt using Tavily, retrying on failure.
 
-        This method wraps the TavilySearchResults tool, which sends the prompt to the
-        Tavily API and returns an LLM-optimized summary of the top results. It retries
-        up to `self.max_retries` times on network or API errors.
+        This method queries the Tavily API with the search tool's configuration, over a
+        shared keep-alive session, and returns a compact context: Tavily's
+        LLM-generated answer plus the title and URL of each result, which is all the LLM
+        needs to answer and cite. The raw result snippets are left out to keep the
+        prompt short. It retries up to `self.max_retries` times (and at most
+        `self.max_retry_time` seconds) on network errors, server errors and rate
+        limiting; other client errors, such as an invalid API key, fail immediately.
+        Each request times out after `self.search_timeout` seconds. Results are
+        memoized per prompt for `self.search_cache_ttl` seconds, so repeated questions
+        skip the Tavily call.
 
         Parameters:
             - prompt (str): The user's question or search phrase.
@@ -133,37 +462,60 @@ class Chatbot:
             - str: A human-readable summary of the top search results.
 
         Raises:
-            - ToolException: If the Tavily tool encounters a network error, downtime, or
-              invalid API key.
+            - requests.RequestException: If the Tavily API request fails due to a
+              network error, timeout, downtime, or invalid API key.
         """
-        return self.search_tool.run(prompt)
+        with self._search_cache_lock:
+            if prompt in self._search_cache:
+                return self._search_cache[prompt]
+        api_key = self.search_tool.api_wrapper.tavily_api_key.get_secret_value()
+        response = _get_search_session().post(
+            f"{TAVILY_API_URL}/search",
+            json={
+                "api_key": api_key,
+                "query": prompt,
+                "max_results": self.search_tool.max_results,
+                "search_depth": self.search_tool.search_depth,
+                "include_answer": True,
+            },
+            timeout=self.search_timeout,
+        )
+        response.raise_for_status()
+        context = _format_search_context(response.json())
+        with self._search_cache_lock:
+            self._search_cache[prompt] = context
+        return context
 
     @backoff.on_exception(
         backoff.expo,
-        LangChainException,
+        RETRYABLE_LLM_ERRORS,
         max_tries=max_retries,
+        max_time=max_retry_time,
+        jitter=backoff.full_jitter,
     )
-    def _invoke(self, prompt: str, context: str) -> ChatbotResponse:
+    def _start_stream(self, prompt: str, context: str) -> Iterator[str]:
         """
-        Invoke the LLM chain with the formatted prompt and context, retrying on failure.
+        Start streaming the LLM chain's output, retrying on failure.
 
-        This method sends the combined prompt and context to the composed Runnable chain
-        (prompt → llm → parser), strips whitespace, and returns the result. It retries
-        on any LangChain-exposed exception, such as model timeouts or downstream tool
-        errors.
+        The first chunk is fetched eagerly so that errors raised while the request is
+        set up are retried here. It retries on transient OpenAI errors (rate limits,
+        timeouts and connection failures) only, for at most `self.max_retry_time`
+        seconds. Errors raised after the first chunk propagate to the stream consumer.
 
         Parameters:
             - prompt (str): The original user input.
             - context (str): Optional context string, e.g. search results.
 
         Returns:
-            - str: The processed and stripped LLM response.
+            - Iterator[str]: The raw JSON text generated by the LLM, chunk by chunk.
 
         Raises:
-            - LangChainException: If the chain invocation fails due to transient LLM or
-              parsing errors.
+            - openai.RateLimitError | openai.APIConnectionError: If the OpenAI API keeps
+              failing after all retries.
         """
-        return self.chain.invoke({"prompt": prompt, "context": context})
+        chunks = self.chain.stream({"prompt": prompt, "context": context})
+        first = next(chunks, "")
+        return itertools.chain([first], chunks)
 
     def generate_response(
         self, prompt: str, enable_search: bool = False
@@ -173,9 +525,13 @@ class Chatbot:
         search.
 
         This method:
-        1. Optionally performs a web search using the Tavily API to retrieve context.
-        2. Sends the prompt and context to the LLM via a LangChain chain.
-        3. Parses the raw response to extract both the answer and any cited sources.
+        1. Returns a cached response if the same prompt was already answered.
+        2. Optionally performs a web search using the Tavily API to retrieve context.
+        3. Sends the prompt and context to the LLM via a LangChain chain.
+        4. Parses the raw response to extract both the answer and any cited sources.
+
+        It consumes `stream_response` in full, so both share the same caching, retry
+        and validation logic.
 
         Parameters:
             - prompt (str): The user's question or prompt.
@@ -187,9 +543,48 @@ class Chatbot:
             - sources (dict[str, str]): A dictionary mapping source names to URLs, if
               present. Sources are only returned if `enable_search` is True, even if the
               LLM includes them in the response.
+
+        Raises:
+            - OutputParserException: If the LLM output is not a valid response.
+        """
+        stream = self.stream_response(prompt, enable_search)
+        answer = "".join(stream)
+        return answer, stream.sources
+
+    def stream_response(
+        self,
+        prompt: str,
+        enable_search: bool = False,
+        search: Callable[[str], str] | None = None,
+    ) -> ResponseStream:
+        """
+        Stream a response to the given prompt, optionally enriched by web search.
+
+        The cache lookup, the optional web search and the start of the LLM request
+        (with retries) happen before returning, while the rest of the answer is only
+        generated as the returned stream is iterated.
+
+        Parameters:
+            - prompt (str): The user's question or prompt.
+            - enable_search (bool, optional): Whether to include web search context.
+              Defaults to False.
+            - search (Callable[[str], str], optional): Function used to fetch the web
+              search context, e.g. to wrap `search` with progress reporting. Only
+              called on a cache miss. Defaults to `search`.
+
+        Returns:
+            - ResponseStream: An iterable over answer text chunks, whose `sources`
+              attribute holds the cited sources once the stream is exhausted.
         """
-        context = self._search(prompt) if enable_search else ""
-        response = self._invoke(prompt, context)
-        # Discard sources if web search was not enabled, even if LLM included them
-        sources = response.sources if enable_search else {}
-        return response.answer, sources
+        cached = self.cache.get(prompt, enable_search)
+        if cached is not None:
+            return ResponseStream(iter([cached.model_dump_json()]), enable_search)
+
+        search = search or self.search
+        context = search(prompt) if enable_search else ""
+        chunks = self._start_stream(prompt, context)
+        return ResponseStream(
+            chunks,
+            enable_search,
+            on_complete=partial(self.cache.put, prompt, enable_search),
+        )
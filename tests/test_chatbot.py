@@ -1,11 +1,26 @@
+import json
+
+import httpx
+import openai
 import pytest
+import requests
 from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import PromptTemplate
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables.base import Runnable
 from langchain_openai import ChatOpenAI
 
-from chatbot import Chatbot
+import chatbot
+from chatbot import (
+    Chatbot,
+    ChatbotResponse,
+    ResponseCache,
+    ResponseStream,
+    parse_response,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -19,17 +34,27 @@ def test_init_attributes():
     """Ensure Chatbot initializes all core attributes when API keys are present."""
     bot = Chatbot()
     assert hasattr(bot, "prompt_template")
-    assert isinstance(bot.prompt_template, PromptTemplate)
+    assert isinstance(bot.prompt_template, ChatPromptTemplate)
     assert hasattr(bot, "llm")
     assert isinstance(bot.llm, ChatOpenAI)
     assert hasattr(bot, "search_tool")
     assert isinstance(bot.search_tool, TavilySearchResults)
     assert hasattr(bot, "parser")
-    assert isinstance(bot.parser, StrOutputParser)
+    assert isinstance(bot.parser, PydanticOutputParser)
     assert hasattr(bot, "chain")
     assert isinstance(bot.chain, Runnable)
 
 
+def test_clients_are_shared_between_instances():
+    """Ensure Chatbot instances reuse the same LLM, HTTP/2 and search tool clients."""
+    first, second = Chatbot(), Chatbot()
+    assert first.llm is second.llm
+    assert first.search_tool is second.search_tool
+    assert Chatbot(temperature=0.7).llm is not first.llm
+    assert first.llm.http_client is chatbot._get_http_client()
+    assert chatbot._get_http_client()._transport._pool._http2
+
+
 @pytest.mark.parametrize(
     "env_vars_to_remove, expected_missing, should_raise",
     [
@@ -61,24 +86,217 @@ def test_validate_api_keys(
         Chatbot._validate_api_keys()
 
 
+def use_fake_llm(bot, *contents):
+    """Replace the bot's LLM with a fake model returning the given outputs in order."""
+    messages = iter([AIMessage(content=content) for content in contents])
+    fake_llm = GenericFakeChatModel(messages=messages)
+    bot.chain = bot.prompt_template | fake_llm | StrOutputParser()
+
+
+@pytest.mark.parametrize(
+    "enable_search, expected_sources",
+    [(True, {"Wikipedia": "https://wikipedia.org"}), (False, {})],
+)
+def test_generate_response_sources(monkeypatch, enable_search, expected_sources):
+    """Test that sources from the parsed response are only returned with search."""
+    bot = Chatbot()
+    use_fake_llm(
+        bot,
+        '{"answer": "Here\'s the answer.", '
+        '"sources": {"Wikipedia": "https://wikipedia.org"}}',
+    )
+    monkeypatch.setattr(bot, "search", lambda prompt: "context")
+    answer, sources = bot.generate_response("Question?", enable_search)
+    assert answer == "Here's the answer."
+    assert sources == expected_sources
+
+
+def test_response_cache_normalizes_prompts_and_partitions_by_search():
+    """Test that cached responses match normalized prompts in the same search mode."""
+    cache = ResponseCache()
+    response = ChatbotResponse(answer="Brasília", sources={})
+    assert cache.get("What is the capital of Brazil?", enable_search=False) is None
+
+    cache.put("What is the capital of Brazil?", False, response)
+    assert cache.get("what is  the capital of brazil", False) == response
+    assert cache.get("What is the capital of Brazil?", True) is None
+    assert cache.get("What is the capital of Spain?", False) is None
+
+
+def test_response_cache_evicts_least_recently_used_entries():
+    """Test that the cache keeps at most `max_entries` responses."""
+    cache = ResponseCache(max_entries=2)
+    for i, prompt in enumerate(("first", "second", "third")):
+        cache.put(prompt, False, ChatbotResponse(answer=str(i)))
+    assert cache.get("first", False) is None
+    assert cache.get("third", False).answer == "2"
+
+
+def test_response_cache_expires_search_enabled_entries():
+    """Test that search-enabled responses expire after `search_ttl` seconds."""
+    now = [0.0]
+    cache = ResponseCache(search_ttl=60, timer=lambda: now[0])
+    response = ChatbotResponse(answer="Sunny", sources={"Weather": "https://w.org"})
+    cache.put("Weather today?", True, response)
+    cache.put("Weather today?", False, ChatbotResponse(answer="I don't know."))
+
+    now[0] = 59
+    assert cache.get("Weather today?", True) == response
+    now[0] = 61
+    assert cache.get("Weather today?", True) is None
+    assert cache.get("Weather today?", False).answer == "I don't know."
+
+
+def test_generate_response_reuses_cached_answer(monkeypatch):
+    """Test that a repeated prompt is served from the cache without a new LLM call."""
+    bot = Chatbot()
+    use_fake_llm(
+        bot,
+        '{"answer": "Brasília", "sources": {"Wiki": "https://wiki.org"}}',
+        '{"answer": "Brasília", "sources": {}}',
+    )
+    searches = []
+    monkeypatch.setattr(bot, "search", lambda prompt: searches.append(prompt) or "")
+
+    prompt = "What is the capital of Brazil?"
+    first = bot.generate_response(prompt, enable_search=True)
+    second = bot.generate_response(prompt, enable_search=True)
+    assert first == second == ("Brasília", {"Wiki": "https://wiki.org"})
+    assert searches == [prompt]
+
+    # The second fake output is only consumed on a cache miss
+    assert bot.generate_response(prompt) == ("Brasília", {})
+
+
+def test_stream_response_yields_answer_and_sources(monkeypatch):
+    """Test that streaming yields only answer text and exposes sources at the end."""
+    bot = Chatbot()
+    content = (
+        '{"answer": "Brasília is the capital.", '
+        '"sources": {"Wiki": "https://wiki.org"}}'
+    )
+    use_fake_llm(bot, content)
+    monkeypatch.setattr(bot, "search", lambda prompt: "context")
+
+    prompt = "What is the capital of Brazil?"
+    stream = bot.stream_response(prompt, enable_search=True)
+    chunks = list(stream)
+    assert "".join(chunks) == "Brasília is the capital."
+    assert stream.sources == {"Wiki": "https://wiki.org"}
+
+    cached = bot.stream_response(prompt, enable_search=True)
+    assert list(cached) == ["Brasília is the capital."]
+    assert cached.sources == {"Wiki": "https://wiki.org"}
+
+
 @pytest.mark.parametrize(
-    "response, expected_answer, expected_sources",
+    "content",
+    ["Plain text answer, not JSON.", '{"answer": "Truncated ans', '{"answer": ""}'],
+)
+def test_stream_response_rejects_invalid_output(content):
+    """Test that invalid or incomplete LLM output raises and is never cached."""
+    bot = Chatbot()
+    use_fake_llm(bot, content)
+
+    with pytest.raises(OutputParserException):
+        list(bot.stream_response("What is the capital of Brazil?"))
+    assert bot.cache.get("What is the capital of Brazil?", False) is None
+
+
+@pytest.mark.parametrize(
+    "content",
     [
-        (
-            'Here\'s the answer.\n\n{"Wikipedia": "https://wikipedia.org"}',
-            "Here's the answer.",
-            {"Wikipedia": "https://wikipedia.org"},
-        ),
-        (
-            "Just a plain answer with no sources.",
-            "Just a plain answer with no sources.",
-            {},
-        ),
+        '{"answer": "Brasília"}\n\nLet me know if you need anything else.',
+        '```json\n{"answer": "Brasília"}\n```\nHope this helps!',
+    ],
+)
+def test_parse_response_ignores_trailing_text(content):
+    """Test that text after a complete JSON object, fenced or not, is ignored."""
+    assert parse_response(content) == ChatbotResponse(answer="Brasília")
+
+
+@pytest.mark.parametrize("flush_interval, expected_chunks", [(0, 4), (60, 2)])
+def test_response_stream_throttles_chunks(monkeypatch, flush_interval, expected_chunks):
+    """Test that answer deltas are batched according to the flush interval."""
+    monkeypatch.setattr(ResponseStream, "flush_interval", flush_interval)
+    text_chunks = ['{"answer": "a', "b", "c", 'd"}']
+    chunks = list(ResponseStream(iter(text_chunks)))
+    assert len(chunks) == expected_chunks
+    assert "".join(chunks) == "abcd"
+
+
+@pytest.mark.parametrize(
+    "error, expected_calls",
+    [
+        (openai.APIConnectionError(request=httpx.Request("POST", "https://x")), 5),
+        (OutputParserException("invalid JSON"), 1),
     ],
 )
-def test_parse_response(response, expected_answer, expected_sources):
-    """Test parsing of LLM response into answer and sources dictionary."""
+def test_start_stream_retries_only_transient_errors(monkeypatch, error, expected_calls):
+    """Test that _start_stream retries transient OpenAI errors but not parse errors."""
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda seconds: None)
     bot = Chatbot()
-    answer, sources = bot._parse_response(response)
-    assert answer == expected_answer
-    assert sources == expected_sources
+    calls = []
+
+    class FailingChain:
+        def stream(self, inputs):
+            calls.append(inputs)
+            raise error
+            yield
+
+    bot.chain = FailingChain()
+    with pytest.raises(type(error)):
+        bot._start_stream("Question?", "")
+    assert len(calls) == expected_calls
+
+
+def tavily_response(status_code, payload):
+    """Build a requests.Response as returned by the Tavily search endpoint."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def test_search_returns_compact_context_and_memoizes(monkeypatch):
+    """Test that search keeps only the answer and source links, and is memoized."""
+    bot = Chatbot()
+    queries = []
+
+    def fake_post(url, json, **kwargs):
+        queries.append(json["query"])
+        return tavily_response(
+            200,
+            {
+                "answer": f"{json['query']} is a country.",
+                "results": [
+                    {"title": "Wiki", "url": "https://wiki.org", "content": "Long"}
+                ],
+            },
+        )
+
+    monkeypatch.setattr(chatbot._get_search_session(), "post", fake_post)
+    context = bot.search("Brazil")
+    assert context == (
+        "Answer: Brazil is a country.\n\nSources:\n1. Wiki: https://wiki.org"
+    )
+    assert bot.search("Brazil") == context
+    bot.search("Argentina")
+    assert queries == ["Brazil", "Argentina"]
+
+
+@pytest.mark.parametrize("status_code, expected_calls", [(401, 1), (429, 5), (503, 5)])
+def test_search_retries_only_transient_errors(monkeypatch, status_code, expected_calls):
+    """Test that search retries rate limits and server errors but not client errors."""
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda seconds: None)
+    bot = Chatbot()
+    timeouts = []
+
+    def fake_post(url, json, timeout):
+        timeouts.append(timeout)
+        return tavily_response(status_code, {})
+
+    monkeypatch.setattr(chatbot._get_search_session(), "post", fake_post)
+    with pytest.raises(requests.HTTPError):
+        bot.search("Brazil")
+    assert timeouts == [bot.search_timeout] * expected_calls